@@ -0,0 +1,39 @@
+# Copyright 2022 Tommy Lau @ SLODT
+#
+# Licensed under the GPL License, Version 3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.gnu.org/licenses/gpl-3.0.html
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Shared pytest environment: one bpy stub and one add-on package stub.
+
+This lives outside the io_scene_bwx package on purpose: pytest imports
+conftest files package-aware, so a conftest inside the package would
+itself pull in the real package __init__ (and its bpy import) before
+any stub could be installed. From here it runs before collection
+descends into the package, and all test modules share the same stub
+instances.
+"""
+
+import sys
+import types
+from pathlib import Path
+
+# Register an io_scene_bwx package stub rooted at the add-on directory so
+# submodules import without running the real package __init__, which
+# registers the Blender operators
+if 'io_scene_bwx' not in sys.modules:
+    _pkg = types.ModuleType('io_scene_bwx')
+    _pkg.__path__ = [str(Path(__file__).resolve().parent / 'io_scene_bwx')]
+    sys.modules['io_scene_bwx'] = _pkg
+
+from io_scene_bwx.tests._bpy_stub import install
+
+install()
@@ -77,9 +77,13 @@ class ImportBWX(Operator, ImportHelper):
 
     def import_bwx(self, context):
         import os
+        from io_scene_bwx.logging_utils import get_logger
 
         self.set_debug_log()
+        # Resolved once here; unit_import runs per file in batch imports
         import_settings = self.as_keywords()
+        logger = get_logger()
+        logger.setLevel(self.loglevel)
 
         if self.files:
             # Multiple file import
@@ -87,14 +91,14 @@ class ImportBWX(Operator, ImportHelper):
             dirname = os.path.dirname(self.filepath)
             for file in self.files:
                 path = os.path.join(dirname, file.name)
-                if self.unit_import(path, import_settings) == {'FINISHED'}:
+                if self.unit_import(path, import_settings, logger) == {'FINISHED'}:
                     ret = {'FINISHED'}
             return ret
         else:
             # Single file import
-            return self.unit_import(self.filepath, import_settings)
+            return self.unit_import(self.filepath, import_settings, logger)
 
-    def unit_import(self, filename, import_settings):
+    def unit_import(self, filename, import_settings, logger):
         import time
         from io_scene_bwx.bwx_io import BWXImporter, ImportError
         from io_scene_bwx.bwx_blender import BWXBlender
@@ -104,13 +108,12 @@ class ImportBWX(Operator, ImportHelper):
             bwx_importer.read()
             bwx_importer.checks()
 
-            print("Data are loaded, start creating Blender stuff")
+            logger.info("Data are loaded, start creating Blender stuff")
 
             start_time = time.time()
             bwx_blender = BWXBlender(bwx_importer)
             bwx_blender.create()
-            elapsed_s = "{:.2f}s".format(time.time() - start_time)
-            print("BWX import finished in " + elapsed_s)
+            logger.info("BWX import finished in %.2fs", time.time() - start_time)
 
             return {'FINISHED'}
 
@@ -13,15 +13,46 @@
 # limitations under the License.
 
 
-import bpy
+import os
 import pathlib
+from functools import lru_cache
+
+import bpy
+import numpy as np
 from bpy_extras.image_utils import load_image
 from mathutils import Vector, Quaternion, Matrix
 
+from io_scene_bwx.logging_utils import get_logger
+
 # TIMELINE_BASE = 160  # 24 fps
 TIMELINE_BASE = 32  # 120 fps
 
 
+@lru_cache(maxsize=128)
+def _find_import_path(dirname):
+    """Locate the nearest 'Graphic' ancestor, cached per directory.
+
+    Batch imports usually pull every file from the same directory, so the
+    walk only runs once per batch, and it stops at the first hit instead
+    of materializing every ancestor.
+    """
+    path = pathlib.Path(dirname)
+    for p in (path, *path.parents):
+        if p.stem == "Graphic":
+            return str(p.resolve())
+    return ''
+
+
+@lru_cache(maxsize=4096)
+def _animation_name(filename):
+    """Animation name from a file name, cached per file name.
+
+    Batch imports see the same HEROBIO_default / HEROBIO_attack style
+    names over and over, so repeats skip the Path and split work.
+    """
+    return pathlib.Path(filename).stem.split('_')[-1].lower()
+
+
 class BWXBlender:
     """Main BWX import class."""
 
@@ -29,26 +60,27 @@ class BWXBlender:
         self.nodal_material_wrap_map = {}
         self.unique_materials = {}
         self.bwx = bwx
-        import_path = [p for p in pathlib.Path(bwx.filename).parents if p.stem == "Graphic"]
-        self.import_path = str(import_path[0].resolve()) if import_path else ''
-        self.animation = pathlib.Path(bwx.filename).stem.split('_')[-1].lower()
+        self.import_path = _find_import_path(os.path.dirname(bwx.filename))
+        self.animation = _animation_name(bwx.filename)
 
     def create(self):
         """Create BWX main worker method."""
         self.prepare_data()
 
         def set_matrix(matrix):
+            # BWX matrices are stored column major, either flat (16,) or (4, 4)
             mat = Matrix()
+            m = np.asarray(matrix, dtype=np.float32).reshape(4, 4)
             for i in range(4):
-                mat.col[i] = [matrix[j] for j in range(i * 4, (i + 1) * 4)]
+                mat.col[i] = m[i]
             return mat
 
-        def create_animation(ob, matrices):
+        def create_animation(ob, timelines, matrices):
             ob.rotation_mode = "QUATERNION"
             ad = ob.animation_data_create()
             action = ob.animation_data.action = bpy.data.actions.new(f'{name}_Action')
 
-            for [timeline, matrix] in matrices:
+            for timeline, matrix in zip(timelines, matrices):
                 kf = timeline / TIMELINE_BASE
                 (ob.location, ob.rotation_quaternion, ob.scale) = set_matrix(matrix).decompose()
                 ob.keyframe_insert(data_path='location', frame=kf)
@@ -58,28 +90,28 @@ class BWXBlender:
             return ad, action
 
         for o in self.bwx.model:
-            [name, material, meshes, matrices] = o
-            [_, sub_material, positions, _normals, tex_coords, faces] = meshes[0]
+            [name, material, meshes, (matrix_timelines, matrix_frames)] = o
+            base_mesh = meshes[0]
 
             # Material
-            mat = self.create_material(material, sub_material)
+            mat = self.create_material(material, base_mesh.sub_material)
 
             # Mesh
             me = bpy.data.meshes.new(name)
             me.materials.append(mat)
-            self.create_mesh(me, positions, tex_coords, faces)
+            self.create_mesh(me, base_mesh.positions, base_mesh.tex_coords, base_mesh.faces)
 
             # Object
             ob = bpy.data.objects.new(name, me)
 
             # Vertex Animation
             if len(meshes) > 1:
-                for [timeline, _, positions, _, _, faces] in meshes:
+                for mesh in meshes:
                     # Update mesh
-                    self.create_mesh(me, positions, tex_coords, faces)
+                    self.create_mesh(me, mesh.positions, base_mesh.tex_coords, mesh.faces)
 
                     # Create new shape key
-                    n = timeline / TIMELINE_BASE
+                    n = mesh.timeline / TIMELINE_BASE
                     sk = ob.shape_key_add(name=f'Frame {n}', from_mix=False)
                     sk.interpolation = 'KEY_LINEAR'
                     ob.data.shape_keys.eval_time = n * 10
@@ -88,15 +120,15 @@ class BWXBlender:
                 ob.data.shape_keys.use_relative = False
 
             # Matrix Animation
-            if len(matrices) > 1:
-                (ad, action) = create_animation(ob, matrices)
+            if len(matrix_timelines) > 1:
+                (ad, action) = create_animation(ob, matrix_timelines, matrix_frames)
                 if action:
                     track = ad.nla_tracks.new()
                     track.name = self.animation
                     _strip = track.strips.new(action.name, 1, action)
             else:
                 # Only apply object matrix when there's no animation
-                ob.matrix_basis = set_matrix(matrices[0][1])
+                ob.matrix_basis = set_matrix(matrix_frames[0])
 
             bpy.context.collection.objects.link(ob)
             ob.select_set(True)
@@ -108,7 +140,8 @@ class BWXBlender:
             ca.lens_unit = 'FOV'
             ca.lens = 38.6
             ob = bpy.data.objects.new(name, ca)
-            (_, action) = create_animation(ob, matrices)
+            (_, action) = create_animation(ob, [mf.timeline for mf in matrices],
+                                           [mf.matrix for mf in matrices])
 
             if action:
                 for f in action.fcurves:
@@ -120,7 +153,8 @@ class BWXBlender:
 
     def prepare_data(self):
         """Prepare data, just before creation."""
-        print(self.import_path)
+        # %s-deferred so the formatting only happens if DEBUG is enabled
+        get_logger().debug("import path: %s", self.import_path)
 
     def create_mesh(self, me, positions, tex_coords, faces):
         me.clear_geometry()
@@ -153,7 +187,7 @@ class BWXBlender:
             self.nodal_material_wrap_map[ma] = ma_wrap
             ma_wrap.use_nodes = True
 
-            [_, _, _, _, texture_file] = materials[sub_material]
+            texture_file = materials[sub_material].texture_path
             img = load_image(texture_file, self.import_path, recursive=True, verbose=True, check_existing=True)
 
             if img:
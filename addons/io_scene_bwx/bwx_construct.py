@@ -26,6 +26,25 @@ def singleton(arg):
 @singleton
 class PackedInt(Construct):
     def _parse(self, stream, context, path):
+        # Fast path: scan the continuation bits straight off the BytesIO
+        # buffer and seek past them, instead of a stream_read call per byte
+        getbuffer = getattr(stream, "getbuffer", None)
+        if getbuffer is not None:
+            with getbuffer() as buf:
+                pos = stream.tell()
+                end = pos
+                limit = len(buf)
+                while end < limit and buf[end] & 0b10000000:
+                    end += 1
+                if end < limit:
+                    num = 0
+                    for i in range(end, pos - 1, -1):
+                        num = (num << 7) | (buf[i] & 0b01111111)
+                    self.length = end + 1 - pos
+                    stream.seek(end + 1)
+                    return num
+            raise StreamError("stream ended before packed int terminated", path=path)
+
         self.length = 0
         acc = []
         while True:
@@ -65,18 +84,19 @@ class SFormatField(Construct):
     def __init__(self, endianity, format):
         super().__init__()
         self.fmtstr = endianity + format
-        self.length = struct.calcsize(endianity + format)
+        # Precompile so parse/build skip re-parsing the format string
+        self._struct = struct.Struct(self.fmtstr)
+        self.length = self._struct.size
 
     def _parse(self, stream, context, path):
+        # stream_read already guarantees the length, so unpack cannot fail
+        # here; no need to set up an exception handler per field
         data = stream_read(stream, self.length, path)
-        try:
-            return -struct.unpack(self.fmtstr, data)[0]
-        except Exception:
-            raise FormatFieldError("struct %r error during parsing" % self.fmtstr, path=path)
+        return -self._struct.unpack(data)[0]
 
     def _build(self, obj, stream, context, path):
         try:
-            data = struct.pack(self.fmtstr, -obj)
+            data = self._struct.pack(-obj)
         except Exception:
             raise FormatFieldError("struct %r error during building, given value %r" % (self.fmtstr, obj), path=path)
         stream_write(stream, data, self.length, path)
@@ -96,9 +116,54 @@ def SInt16sl():
     return SFormatField("<", "H")
 
 
+class MemoryBytes(Construct):
+    """Like Bytes, but returns a memoryview into the stream buffer.
+
+    Raw vertex/index buffers are decoded downstream with NumPy, which
+    takes any buffer, so there is no point copying them out into bytes
+    objects during the parse.
+    """
+
+    def __init__(self, length):
+        super().__init__()
+        self.length = length
+
+    def _parse(self, stream, context, path):
+        length = self.length(context) if callable(self.length) else self.length
+        getbuffer = getattr(stream, "getbuffer", None)
+        if getbuffer is not None:
+            pos = stream.tell()
+            data = getbuffer()[pos:pos + length]
+            if len(data) == length:
+                stream.seek(pos + length)
+                return data
+            raise StreamError(f"stream read less than specified amount, expected {length}, found {len(data)}", path=path)
+        return stream_read(stream, length, path)
+
+    def _build(self, obj, stream, context, path):
+        data = bytes(obj)
+        stream_write(stream, data, len(data), path)
+        return obj
+
+    def _sizeof(self, context, path):
+        length = self.length(context) if callable(self.length) else self.length
+        return length
+
+
 def get_block(bwx, name):
-    a = [b.data for b in bwx.block if b.name == name]
-    return a[0] if len(a) > 0 else None
+    # Index the blocks once per parsed file; the importer looks several
+    # names up back-to-back and the scan was O(blocks) each time
+    index = getattr(bwx, "_block_index", None)
+    if index is None:
+        index = {}
+        for b in bwx.block:
+            # First block wins on duplicate names, like the linear scan
+            # this index replaced
+            index.setdefault(b.name, b.data)
+        bwx._block_index = index
+    # Block names stay raw bytes in the parsed tree; encoding the queried
+    # name is cheaper than decoding every name during the parse
+    return index.get(name.encode('utf-8') if isinstance(name, str) else name)
 
 
 # Add Korean EUC-KR support
@@ -109,7 +174,7 @@ bwx_array = Struct(
     # "size" / VarInt,
     "size" / VarInt,
     "count" / PackedInt,
-    "data" / Bytes((lambda this: this.size - this._subcons.count.sizeof())),
+    "data" / MemoryBytes((lambda this: this.size - this._subcons.count.sizeof())),
 )
 
 # Signature D - 0x44
@@ -144,11 +209,22 @@ Block = 0x80
 SL_I32 = 0x49
 SL_STRING = 0x53
 
+
+def _const_string(value):
+    """Encode a bwx_value string constant without walking the grammar."""
+    encoded = value.encode('euc-kr') + b'\x00'
+    return bytes([SL_STRING, len(encoded)]) + encoded
+
+
+def _const_i32(value):
+    """Encode a bwx_value int32 constant without walking the grammar."""
+    return bytes([SL_I32]) + struct.pack('<i', value)
+
 bwx_value = Struct(
     "type" / Byte,
-    "data" / IfThenElse(this.type > 0x80, Bytes(this.type & 0x7f), Switch(this.type, {
+    "data" / IfThenElse(this.type > 0x80, MemoryBytes(this.type & 0x7f), Switch(this.type, {
         0x41: bwx_array,
-        0x42: Prefixed(VarInt, GreedyBytes),
+        0x42: FocusedSeq("data", "length" / VarInt, "data" / MemoryBytes(this.length)),
         0x43: SByte,
         0x44: bwx_darray,
         0x46: Float32l,
@@ -165,7 +241,7 @@ bwx_value = Struct(
 # 0
 # ------------------------------------------------------------
 bwx_0_struct = Struct(
-    "signature" / Const(bwx_value.build(dict(type=SL_STRING, data="SLBWX"))),  # SLBWX
+    "signature" / Const(_const_string("SLBWX")),  # SLBWX
 )
 # ------------------------------------------------------------
 # 0 - END
@@ -180,7 +256,7 @@ bwx_header_struct = Struct(
     "count" / VarInt,
     "name" / bwx_value,
     "description" / bwx_value,
-    "magic" / Const(bwx_value.build(dict(type=SL_I32, data=0x504e5800))),  # PNX
+    "magic" / Const(_const_i32(0x504e5800)),  # PNX
     "version_type" / Const(b'W'),
     "version" / Enum(Int16ul, SLv1=0x0500, SLv2=0x0602),
     "other" / bwx_value,
@@ -196,7 +272,7 @@ bwx_texture_struct = Struct(
     "A" / Const(b'A'),  # Array
     "size" / VarInt,
     "count" / VarInt,
-    "TEX" / Const(bwx_value.build(dict(type=SL_STRING, data="TEX"))),  # TEX
+    "TEX" / Const(_const_string("TEX")),  # TEX
     "most_0" / bwx_value,
     "filename" / bwx_value,
 )
@@ -205,7 +281,7 @@ bwx_sub_material_struct = Struct(
     "A" / Const(b'A'),  # Array
     "size" / VarInt,
     "count" / VarInt,
-    "SUBMTRL" / Const(bwx_value.build(dict(type=SL_STRING, data="SUBMTRL"))),  # SUBMTRL
+    "SUBMTRL" / Const(_const_string("SUBMTRL")),  # SUBMTRL
     "diffuse" / bwx_value,
     "ambient" / bwx_value,
     "specular" / bwx_value,
@@ -224,7 +300,7 @@ bwx_material_struct = Struct(
         "A" / Const(b'A'),  # Array
         "size" / VarInt,
         "count" / VarInt,
-        "MTRL" / Const(bwx_value.build(dict(type=SL_STRING, data="MTRL"))),  # MTRL
+        "MTRL" / Const(_const_string("MTRL")),  # MTRL
         "material_name" / bwx_value,
         "sub_material" / Array(this.count - 2, bwx_sub_material_struct),
     )),
@@ -240,7 +316,7 @@ bwx_matrix_struct = Struct(
     "A" / Const(b'A'),  # Array
     "size" / VarInt,
     "count" / VarInt,
-    "MATRIX" / Const(bwx_value.build(dict(type=SL_STRING, data="MATRIX"))),  # MATRIX
+    "MATRIX" / Const(_const_string("MATRIX")),  # MATRIX
     "matrices" / Array(this.count - 1, Struct(
         "type" / Const(b'\xc4'),
         "timeline" / Int32ul,
@@ -252,7 +328,7 @@ bwx_meshf_struct = Struct(
     "A" / Const(b'A'),  # Array
     "size" / VarInt,
     "count" / VarInt,
-    "MESHF" / Const(bwx_value.build(dict(type=SL_STRING, data="MESHF"))),  # MESHF
+    "MESHF" / Const(_const_string("MESHF")),  # MESHF
     "timeline" / bwx_value,
     "A" / Const(b'A'),  # Array
     "size" / VarInt,
@@ -268,7 +344,7 @@ bwx_mesh_struct = Struct(
     "A" / Const(b'A'),  # Array
     "size" / VarInt,
     "count" / VarInt,
-    "MESH" / Const(bwx_value.build(dict(type=SL_STRING, data="MESH"))),  # MESH
+    "MESH" / Const(_const_string("MESH")),  # MESH
     "A" / Const(b'A'),  # Array
     "sub_size" / VarInt,
     "sub_count" / VarInt,
@@ -295,7 +371,7 @@ bwx_object_struct = Struct(
         "A" / Const(b'A'),  # Array
         "size" / VarInt,
         "count" / VarInt,
-        "OBJ2" / Const(bwx_value.build(dict(type=SL_STRING, data="OBJ2"))),  # OBJ2
+        "OBJ2" / Const(_const_string("OBJ2")),  # OBJ2
         "name" / bwx_value,
         "unknown1" / bwx_value,
         "material" / bwx_value,
@@ -322,7 +398,7 @@ bwx_matrix2_struct = Struct(
     "A" / Const(b'A'),  # Array
     "size" / VarInt,
     "count" / VarInt,
-    "MATRIX" / Const(bwx_value.build(dict(type=SL_STRING, data="MATRIX"))),  # MATRIX
+    "MATRIX" / Const(_const_string("MATRIX")),  # MATRIX
     "matrices" / Array(this.count - 1, Struct(
         "type" / Const(b'\xe0'),
         "timeline" / Int32ul,
@@ -341,7 +417,7 @@ bwx_dx_meshf_struct = Struct(
     "A" / Const(b'A'),  # Array
     "size" / VarInt,
     "count" / VarInt,
-    "DXMESHF" / Const(bwx_value.build(dict(type=SL_STRING, data="DXMESHF"))),  # DXMESHF
+    "DXMESHF" / Const(_const_string("DXMESHF")),  # DXMESHF
     "timeline" / bwx_value,
     "vertex_type" / bwx_value,  # Maybe, seems always = 0x15
     "vertex_count" / bwx_value,
@@ -353,7 +429,7 @@ bwx_dx_mesh_struct = Struct(
     "A" / Const(b'A'),  # Array
     "size" / VarInt,
     "count" / VarInt,
-    "DXMESH" / Const(bwx_value.build(dict(type=SL_STRING, data="DXMESH"))),  # DXMESH
+    "DXMESH" / Const(_const_string("DXMESH")),  # DXMESH
     "sub_material" / bwx_value,
     "A" / Const(b'A'),  # Array
     "sub_size" / VarInt,
@@ -371,7 +447,7 @@ bwx_dx_object_struct = Struct(
         "A" / Const(b'A'),  # Array
         "size" / VarInt,
         "count" / VarInt,
-        "DXOBJ" / Const(bwx_value.build(dict(type=SL_STRING, data="DXOBJ"))),  # DXOBJ
+        "DXOBJ" / Const(_const_string("DXOBJ")),  # DXOBJ
         "name" / bwx_value,
         "unknown1" / bwx_value,
         "material" / bwx_value,
@@ -415,9 +491,9 @@ bwx_camera_struct = Struct(
         "A" / Const(b'A'),  # Array
         "size" / VarInt,
         "cam_count" / VarInt,
-        "CAM" / Const(bwx_value.build(dict(type=SL_STRING, data="CAM"))),  # CAM
+        "CAM" / Const(_const_string("CAM")),  # CAM
         "name" / bwx_value,
-        "CAMR" / Const(bwx_value.build(dict(type=SL_I32, data=0x43414d52))),  # CAMR
+        "CAMR" / Const(_const_i32(0x43414d52)),  # CAMR
         "unknown" / bwx_value,
         "matrix" / Array(this.cam_count - 4, bwx_camera_matrix_struct),
     )),
@@ -428,20 +504,22 @@ bwx_camera_struct = Struct(
 
 # BWX Main Blocks
 bwx_main_block_struct = Struct(
-    "name" / Prefixed(VarInt, CString("utf-8")),
+    # Kept as raw bytes; get_block encodes the queried name instead of
+    # paying a str allocation + UTF-8 decode per block here
+    "name" / Prefixed(VarInt, NullStripped(GreedyBytes)),
     "data" / Switch(this.name, {
-        "0": bwx_0_struct,
-        "HEAD": bwx_header_struct,
-        "MTRL": bwx_material_struct,
-        "OBJ2": bwx_object_struct,
-        "OBJECT": bwx_object_struct,
-        "CAM": bwx_camera_struct,
-        "LIGHT": bwx_value,  # TODO
-        "SOUND": bwx_value,  # TODO
-        "BONE": bwx_value,  # TODO
-        "CHART": bwx_value,  # TODO
-        "DXOBJ": bwx_dx_object_struct,
-        "SPOB": bwx_dx_object_struct,
+        b"0": bwx_0_struct,
+        b"HEAD": bwx_header_struct,
+        b"MTRL": bwx_material_struct,
+        b"OBJ2": bwx_object_struct,
+        b"OBJECT": bwx_object_struct,
+        b"CAM": bwx_camera_struct,
+        b"LIGHT": bwx_value,  # TODO
+        b"SOUND": bwx_value,  # TODO
+        b"BONE": bwx_value,  # TODO
+        b"CHART": bwx_value,  # TODO
+        b"DXOBJ": bwx_dx_object_struct,
+        b"SPOB": bwx_dx_object_struct,
     }, default=bwx_value),
 )
 
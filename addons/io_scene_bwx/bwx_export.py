@@ -0,0 +1,561 @@
+# Copyright 2022 Tommy Lau @ SLODT
+#
+# Licensed under the GPL License, Version 3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.gnu.org/licenses/gpl-3.0.html
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import codecs
+import os
+import pathlib
+import shutil
+import struct
+from collections import defaultdict
+
+import numpy as np
+
+# SLv2 vertex buffers carry two extra (unknown) vertices after the counted ones
+EXTRA_VERTICES_SLV2 = 2
+
+# Cached codec entry, skipping the registry lookup done by str.encode('euc-kr')
+_EUCKR_ENCODE = codecs.getencoder('euc-kr')
+
+
+def _encode_string(value):
+    """Encode a null-terminated string, fast-pathing pure-ASCII names."""
+    if value.isascii():
+        return value.encode('ascii') + b'\x00'
+    return _EUCKR_ENCODE(value)[0] + b'\x00'
+
+
+# Precompiled packers, so hot paths skip re-parsing the format strings
+_U16 = struct.Struct('<H').pack
+_U32 = struct.Struct('<I').pack
+_F32 = struct.Struct('<f').pack
+_16F = struct.Struct('<16f').pack
+
+# Zeroed target matrix + unknown floats trailing every camera frame
+_CAM_ZERO_TAIL = b'\x00' * (16 * 4 + 6 * 4)
+
+# Zeroed unknown floats trailing every SLv2 matrix frame
+_MATRIX_V2_PAD = b'\x00' * (7 * 4)
+
+# The extra (unknown) SLv2 vertices, all zero, prebuilt once
+_DUMMY_VERTICES = b'\x00' * (32 * EXTRA_VERTICES_SLV2)
+
+# One- and two-byte VarInt encodings, precomputed; length prefixes almost
+# always fall in this range
+_VARINT_SMALL = tuple(
+    bytes([v]) if v < 0x80 else bytes([0x80 | (v & 0x7F), v >> 7])
+    for v in range(0x4000)
+)
+
+# bwx_value type tags, see bwx_construct
+SL_BYTES = 0x42
+SL_FLOAT = 0x46
+SL_I32 = 0x49
+SL_STRING = 0x53
+SL_U16 = 0x57
+SL_U8 = 0x59
+
+
+def _build_tag(name):
+    """Prebuild the bwx_value string encoding of a literal tag."""
+    encoded = name.encode('ascii') + b'\x00'
+    return bytes([SL_STRING, len(encoded)]) + encoded
+
+
+# Literal tag strings emitted for every block / material / mesh / frame,
+# encoded once at import time
+_TAG_SLBWX = _build_tag("SLBWX")
+_TAG_SHININGLORE = _build_tag("ShiningLore")
+_TAG_MTRL = _build_tag("MTRL")
+_TAG_SUBMTRL = _build_tag("SUBMTRL")
+_TAG_TEX = _build_tag("TEX")
+_TAG_OBJ2 = _build_tag("OBJ2")
+_TAG_MESH = _build_tag("MESH")
+_TAG_MESHF = _build_tag("MESHF")
+_TAG_DXOBJ = _build_tag("DXOBJ")
+_TAG_DXMESH = _build_tag("DXMESH")
+_TAG_DXMESHF = _build_tag("DXMESHF")
+_TAG_MATRIX = _build_tag("MATRIX")
+_TAG_CAM = _build_tag("CAM")
+
+
+# Zero placeholders (unknown / reserved fields), emitted several times per
+# object and sub material
+_BWX_INT_ZERO = bytes([SL_I32, 0, 0, 0, 0])
+_BWX_COMPACT_ZERO = bytes([0])
+
+
+# Compact bwx_value encodings for 0..65535: the type byte itself below
+# 0x20, then the 0x59 (u8) and 0x57 (u16) forms; mesh indices land here
+_COMPACT_INT = tuple(
+    [bytes([v]) for v in range(0x20)]
+    + [bytes([SL_U8, v]) for v in range(0x20, 0x100)]
+    + [bytes([SL_U16]) + _U16(v) for v in range(0x100, 0x10000)]
+)
+
+
+# Raise this error to have the exporter report an error message.
+class ExportError(RuntimeError):
+    pass
+
+
+class BWXWriter:
+    """BWX Writer class, the inverse of BWXImporter.
+
+    Takes a BWXData scene and serializes it back into the PNX container
+    format described by bwx_construct.
+    """
+
+    def __init__(self, data):
+        """initialization."""
+        self.data = data
+
+    def build(self):
+        """Serialize the whole scene and return the file bytes."""
+        blocks = [
+            ("0", self._build_block_0()),
+            ("HEAD", self._build_head_block()),
+            ("MTRL", self._build_mtrl_block()),
+        ]
+
+        if self.data.version == 1:
+            blocks.append(("OBJ2", self._build_v1_objects()))
+        else:
+            blocks.append(("SPOB", self._build_v2_objects()))
+
+        if self.data.cameras:
+            blocks.append(("CAM", self._build_camera()))
+
+        parts = []
+        for name, data in blocks:
+            parts.append(self._build_prefixed_string(name))
+            parts.append(data)
+
+        # Content size covers the block count and the blocks, not the
+        # signature / size fields themselves nor the trailing "FXWB"
+        block_count = self._build_varint(len(blocks))
+        content_size = self._build_varint(
+            len(block_count) + sum(len(p) for p in parts))
+
+        # Sizes come from the part lengths, so one join allocates the whole
+        # file instead of concatenating the blocks and the framing separately
+        return b''.join([b'BWXF', content_size, block_count, *parts, b'FXWB'])
+
+    def write(self, filename, copy_textures=False):
+        """Build and write the file, optionally staging textures next to it."""
+        data = self.build()
+        fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        if copy_textures:
+            self._copy_textures(pathlib.Path(filename).parent)
+
+    def _copy_textures(self, output_dir):
+        """Copy the referenced textures next to the exported file."""
+        # Dedupe first: scenes reuse the same texture across many materials
+        sources = {}
+        for material in self.data.materials:
+            for sub_material in material.sub_materials:
+                texture_path = sub_material.texture_path
+                if texture_path:
+                    sources.setdefault(os.path.basename(texture_path), texture_path)
+        if not sources:
+            return
+
+        # One directory scan replaces a stat call per destination
+        with os.scandir(output_dir) as entries:
+            existing = {entry.name for entry in entries}
+
+        for name, src_path in sources.items():
+            if name not in existing and os.path.exists(src_path):
+                # copyfile takes the sendfile fast path; the exported copy
+                # does not need the source metadata copy2 carries over
+                shutil.copyfile(src_path, os.path.join(output_dir, name))
+
+    # ------------------------------------------------------------
+    # Value builders
+    # ------------------------------------------------------------
+    def _build_varint(self, value):
+        """Encode a VarInt (LEB128, low group first)."""
+        if value < 0x4000:
+            return _VARINT_SMALL[value]
+        entry = bytearray()
+        while value > 0x7F:
+            entry.append(0x80 | (value & 0x7F))
+            value >>= 7
+        entry.append(value)
+        # The joins downstream take any buffer, no need to copy into bytes
+        return entry
+
+    def _build_prefixed_string(self, value):
+        """Encode a VarInt-prefixed, null-terminated string."""
+        encoded = _encode_string(value)
+        return self._build_varint(len(encoded)) + encoded
+
+    def _build_bwx_value_string(self, value):
+        """Encode a bwx_value string (0x53)."""
+        encoded = _encode_string(value)
+        return b''.join([bytes([SL_STRING]), self._build_varint(len(encoded)), encoded])
+
+    def _build_bwx_value_int(self, value):
+        """Encode a bwx_value 32-bit integer (0x49)."""
+        # Mask so ARGB colors and negative values share the unsigned format
+        return bytes([SL_I32]) + _U32(value & 0xFFFFFFFF)
+
+    def _build_bwx_value_float(self, value):
+        """Encode a bwx_value float (0x46)."""
+        return bytes([SL_FLOAT]) + _F32(value)
+
+    def _build_bwx_value_compact_int(self, value):
+        """Encode an integer in the smallest bwx_value representation."""
+        # One table lookup covers the whole u8/u16 range; counts, timelines
+        # and sub material ids virtually never exceed it
+        if 0 <= value < 0x10000:
+            return _COMPACT_INT[value]
+        return bytes([SL_I32]) + _U32(value & 0xFFFFFFFF)
+
+    def _build_bwx_value_block(self, data):
+        """Encode a short raw data block (type byte with the high bit set)."""
+        if len(data) > 0x7F:
+            raise ExportError(f"Raw block of {len(data)} bytes is too long")
+        return bytes([0x80 | len(data)]) + data
+
+    def _build_bwx_value_bytes(self, data):
+        """Encode a VarInt-prefixed raw buffer (0x42)."""
+        return bytes([SL_BYTES]) + self._build_varint(len(data)) + data
+
+    def _build_array(self, count, body):
+        """Encode an array node: 'A', size, count, items."""
+        count_data = self._build_varint(count)
+        return b''.join([b'A', self._build_varint(len(count_data) + len(body)),
+                         count_data, body])
+
+    def _convert_colors(self):
+        """Convert every sub material color to D3D ARGB in one NumPy pass.
+
+        Returns the diffuse/ambient/specular values of all sub materials in
+        order; float colors are scaled, clipped and bit-packed as a batch,
+        already-packed ints pass through.
+        """
+        colors = [c for material in self.data.materials
+                  for sm in material.sub_materials
+                  for c in (sm.diffuse, sm.ambient, sm.specular)]
+        out = np.empty(len(colors), dtype=np.uint32)
+        rgba = np.ones((len(colors), 4), dtype=np.float32)
+        float_rows = []
+        for i, color in enumerate(colors):
+            if isinstance(color, int):
+                out[i] = color & 0xFFFFFFFF
+            else:
+                rgba[i, :len(color)] = color
+                float_rows.append(i)
+        if float_rows:
+            rows = np.asarray(float_rows)
+            scaled = np.clip(rgba[rows] * 255.0, 0, 255).astype(np.uint32)
+            out[rows] = ((scaled[:, 3] << 24) | (scaled[:, 0] << 16)
+                         | (scaled[:, 1] << 8) | scaled[:, 2])
+        return out
+
+    # ------------------------------------------------------------
+    # Header
+    # ------------------------------------------------------------
+    def _build_block_0(self):
+        return _TAG_SLBWX
+
+    def _build_head_block(self):
+        parts = [
+            self._build_bwx_value_string(self.data.name),
+            _TAG_SHININGLORE,
+            self._build_bwx_value_int(0x504e5800),  # PNX
+            b'W',
+            _U16(0x0500 if self.data.version == 1 else 0x0602),
+            _BWX_INT_ZERO,
+        ]
+        return self._build_array(5, b''.join(parts))
+
+    # ------------------------------------------------------------
+    # Materials
+    # ------------------------------------------------------------
+    def _build_mtrl_block(self):
+        argb = iter(self._convert_colors().tolist())
+        parts = [self._build_material(material, argb) for material in self.data.materials]
+        return self._build_array(len(self.data.materials), b''.join(parts))
+
+    def _build_material(self, material, argb):
+        parts = [_TAG_MTRL,
+                 self._build_bwx_value_string(material.name)]
+        for sub_material in material.sub_materials:
+            parts.append(self._build_sub_material(
+                sub_material, (next(argb), next(argb), next(argb))))
+        # Count includes the MTRL tag and the name on top of the sub materials
+        return self._build_array(len(material.sub_materials) + 2, b''.join(parts))
+
+    def _build_sub_material(self, sub_material, argb):
+        diffuse, ambient, specular = argb
+        parts = [
+            _TAG_SUBMTRL,
+            self._build_bwx_value_int(diffuse),
+            self._build_bwx_value_int(ambient),
+            self._build_bwx_value_int(specular),
+            self._build_bwx_value_float(0.0),
+            self._build_bwx_value_float(sub_material.highlight),
+            self._build_bwx_value_int(1),
+            _BWX_INT_ZERO,
+        ]
+        count = 8
+        if sub_material.texture_path:
+            parts.append(self._build_texture(sub_material.texture_path))
+            count += 1
+        return self._build_array(count, b''.join(parts))
+
+    def _build_texture(self, texture_path):
+        # Plain string split; pathlib would parse the whole path per call
+        filename = os.path.basename(texture_path)
+        parts = [_TAG_TEX,
+                 _BWX_INT_ZERO,
+                 self._build_bwx_value_string(filename)]
+        return self._build_array(3, b''.join(parts))
+
+    # ------------------------------------------------------------
+    # Objects
+    # ------------------------------------------------------------
+    def _build_direction(self, direction):
+        return b'I' + _U32(0x4d534858 if direction == 'MSHX' else 0x4d4e4858)
+
+    def _build_v1_objects(self):
+        parts = [self._build_v1_object(obj) for obj in self.data.objects]
+        return self._build_array(len(self.data.objects), b''.join(parts))
+
+    def _build_v1_object(self, obj):
+        parts = [
+            _TAG_OBJ2,
+            self._build_bwx_value_string(obj.name),
+            _BWX_COMPACT_ZERO,  # unknown1
+            self._build_bwx_value_compact_int(obj.material),
+            _BWX_COMPACT_ZERO,  # unknown2
+            _BWX_COMPACT_ZERO,  # unknown3
+            self._build_direction(obj.direction),
+            self._build_v1_meshes(obj),
+            self._build_array(1, self._build_matrices(obj, include_unknown=False)),
+            _BWX_COMPACT_ZERO,  # sfx
+        ]
+        return self._build_array(10, b''.join(parts))
+
+    def _build_v1_meshes(self, obj):
+        # One MESH block per sub material, holding its animation frames
+        mesh_groups = defaultdict(list)
+        for mesh in obj.meshes:
+            mesh_groups[mesh.sub_material].append(mesh)
+
+        parts = [self._build_v1_mesh(sub_material, meshes, obj.direction == 'MSHX')
+                 for sub_material, meshes in mesh_groups.items()]
+        return self._build_array(len(mesh_groups), b''.join(parts))
+
+    def _build_v1_mesh(self, sub_material, meshes, flip):
+        base_mesh = meshes[0]
+
+        parts = [_TAG_MESH]
+
+        # Sub meshes, one per animation frame; only the first carries UVs
+        frames = [self._build_v1_mesh_frame(mesh, with_uv=(i == 0))
+                  for i, mesh in enumerate(meshes)]
+        parts.append(self._build_array(len(meshes), b''.join(frames)))
+
+        # The importer keeps one sub material for the whole mesh
+        sub_materials = [self._build_bwx_value_compact_int(sub_material)
+                         for _ in range(len(base_mesh.faces))]
+        parts.append(self._build_array(len(base_mesh.faces), b''.join(sub_materials)))
+
+        # Undo the winding flip the importer applied for MSHX objects
+        faces = base_mesh.faces
+        if flip:
+            faces = [(a, c, b) for a, b, c in faces]
+
+        # Indices virtually never exceed u16, so one table lookup per index
+        # replaces the size-dispatch in _build_bwx_value_compact_int; the
+        # rare oversized mesh takes the dispatching path (I32 entries)
+        flat = np.asarray(faces, dtype=np.uint32).ravel()
+        if flat.max(initial=0) < 0x10000:
+            index_data = b''.join(map(_COMPACT_INT.__getitem__, flat.tolist()))
+        else:
+            index_data = b''.join(map(self._build_bwx_value_compact_int,
+                                      flat.tolist()))
+        parts.append(self._build_array(flat.size, index_data))
+
+        parts.append(_BWX_COMPACT_ZERO)  # unknown1
+        parts.append(_BWX_COMPACT_ZERO)  # unknown2
+        parts.append(_BWX_COMPACT_ZERO)  # unknown3
+        parts.append(_BWX_COMPACT_ZERO)  # unknown_20
+        return self._build_array(8, b''.join(parts))
+
+    def _build_v1_mesh_frame(self, mesh, with_uv):
+        # Positions and UVs are fixed-size raw blocks (0x8C = 12 bytes,
+        # 0x88 = 8 bytes), so the tag bytes are interleaved with one NumPy
+        # pass instead of a _build_bwx_value_block call per vertex
+        uv_count = len(mesh.tex_coords) if with_uv else 0
+        parts = [
+            _TAG_MESHF,
+            self._build_bwx_value_compact_int(int(mesh.timeline)),
+            self._build_array(len(mesh.positions),
+                              self._build_tagged_blocks(mesh.positions, 3)),
+            self._build_array(uv_count,
+                              self._build_tagged_blocks(mesh.tex_coords, 2) if uv_count else b''),
+        ]
+        return self._build_array(4, b''.join(parts))
+
+    def _build_tagged_blocks(self, values, width):
+        """Pack (N, width) float rows, each prefixed with its raw-block tag."""
+        arr = np.ascontiguousarray(values, dtype='<f4')
+        count = arr.shape[0]
+        stride = width * 4
+        # Interleave straight into one exactly-sized buffer; the memoryview
+        # goes into the enclosing b''.join without another copy
+        out = np.empty((count, stride + 1), dtype=np.uint8)
+        out[:, 0] = 0x80 | stride
+        out[:, 1:] = arr.view(np.uint8).reshape(count, stride)
+        return out.reshape(-1).data
+
+    def _build_v2_objects(self):
+        parts = [self._build_v2_object(obj) for obj in self.data.objects]
+        return self._build_array(len(self.data.objects), b''.join(parts))
+
+    def _build_v2_object(self, obj):
+        parts = [
+            _TAG_DXOBJ,
+            self._build_bwx_value_string(obj.name),
+            _BWX_COMPACT_ZERO,  # unknown1
+            self._build_bwx_value_compact_int(obj.material),
+            _BWX_COMPACT_ZERO,  # unknown2
+            _BWX_COMPACT_ZERO,  # unknown3
+            self._build_direction(obj.direction),
+            self._build_v2_meshes(obj),
+            self._build_array(1, self._build_matrices(obj, include_unknown=True)),
+            _BWX_COMPACT_ZERO,  # sfx
+        ]
+        return self._build_array(10, b''.join(parts))
+
+    def _build_v2_meshes(self, obj):
+        # One DXMESH block per sub material, holding its animation frames
+        mesh_groups = defaultdict(list)
+        for mesh in obj.meshes:
+            mesh_groups[mesh.sub_material].append(mesh)
+
+        parts = [self._build_v2_mesh(sub_material, meshes, obj.direction == 'MSHX')
+                 for sub_material, meshes in mesh_groups.items()]
+        return self._build_array(len(mesh_groups), b''.join(parts))
+
+    def _build_v2_mesh(self, sub_material, meshes, flip):
+        base_mesh = meshes[0]
+
+        frames = [self._build_v2_mesh_frame(mesh) for mesh in meshes]
+
+        # Undo the winding flip the importer applied for MSHX objects
+        faces = base_mesh.faces
+        if flip:
+            faces = [(a, c, b) for a, b, c in faces]
+
+        # One C-level pass; the *args splat of struct.pack materialized
+        # every index as a Python int first
+        indices = np.asarray(faces)
+        if indices.max(initial=0) > 0xFFFF:
+            # The SLv2 index buffer is u16 by format; casting would wrap
+            raise ExportError(
+                f"Index {int(indices.max())} exceeds the u16 index buffer")
+        indices = indices.astype('<u2')
+        index_count = indices.size
+        index_data = indices.tobytes()
+
+        parts = [
+            _TAG_DXMESH,
+            self._build_bwx_value_compact_int(sub_material),
+            self._build_array(len(meshes), b''.join(frames)),
+            self._build_bwx_value_compact_int(index_count),
+            self._build_bwx_value_bytes(index_data),
+        ]
+        return self._build_array(5, b''.join(parts))
+
+    def _build_v2_mesh_frame(self, mesh):
+        parts = [
+            _TAG_DXMESHF,
+            self._build_bwx_value_compact_int(int(mesh.timeline)),
+            self._build_bwx_value_compact_int(0x15),  # vertex type
+            self._build_bwx_value_compact_int(len(mesh.positions)),
+            self._build_bwx_value_compact_int(0x20),  # vertex size
+            self._build_bwx_value_bytes(self._build_v2_vertex_buffer(mesh)),
+        ]
+        return self._build_array(6, b''.join(parts))
+
+    def _build_v2_vertex_buffer(self, mesh):
+        """Interleave positions/normals/UVs into the 32-byte DirectX layout.
+
+        Built as one (N + extra, 8) float32 array so the whole buffer is
+        assembled by a few NumPy column assignments instead of per-vertex
+        struct.pack calls.
+        """
+        count = len(mesh.positions)
+        out = np.zeros((count, 8), dtype=np.float32)
+        out[:, 0:3] = mesh.positions
+        if len(mesh.normals):
+            out[:, 3:6] = mesh.normals
+        else:
+            out[:, 5] = 1.0
+        if len(mesh.tex_coords):
+            uv = np.asarray(mesh.tex_coords, dtype=np.float32)
+            out[:, 6] = uv[:, 0]
+            # Undo the V flip the importer applied, writing straight into
+            # the output column instead of through a temporary
+            np.subtract(1.0, uv[:, 1], out=out[:, 7])
+        return out.tobytes() + _DUMMY_VERTICES
+
+    # ------------------------------------------------------------
+    # Matrices
+    # ------------------------------------------------------------
+    def _build_matrices(self, obj, include_unknown):
+        type_byte = b'\xe0' if include_unknown else b'\xc4'
+        parts = [_TAG_MATRIX]
+        frame_count = 0
+        pad = _MATRIX_V2_PAD if include_unknown else b''
+        for timeline, matrix in zip(obj.matrix_timelines, obj.matrix_frames):
+            parts.append(type_byte)
+            parts.append(_U32(int(timeline)))
+            parts.append(_16F(*np.asarray(matrix, dtype=np.float32).ravel()))
+            parts.append(pad)
+            frame_count += 1
+
+        return self._build_array(frame_count + 1, b''.join(parts))
+
+    # ------------------------------------------------------------
+    # Camera
+    # ------------------------------------------------------------
+    def _build_camera(self):
+        parts = []
+        for cam in self.data.cameras:
+            cam_parts = [
+                _TAG_CAM,
+                self._build_bwx_value_string(cam.name),
+                self._build_bwx_value_int(0x43414d52),  # CAMR
+                _BWX_INT_ZERO,
+            ]
+
+            for mf in cam.matrices:
+                cam_parts.append(b'B')
+                # timeline + camera + target + 2 x unknown
+                cam_parts.append(self._build_varint(4 + 16 * 4 + 16 * 4 + 3 * 4 + 3 * 4))
+                cam_parts.append(_U32(int(mf.timeline)))
+                cam_parts.append(_16F(*mf.matrix))
+                cam_parts.append(_CAM_ZERO_TAIL)  # target + unknowns
+
+            parts.append(self._build_array(len(cam.matrices) + 4, b''.join(cam_parts)))
+        return self._build_array(len(self.data.cameras), b''.join(parts))
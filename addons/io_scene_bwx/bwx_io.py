@@ -12,10 +12,40 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import pathlib
+import mmap
+import ntpath
+import os
+import re
+from itertools import chain
+
+import numpy as np
+
 from io_scene_bwx.bwx_construct import *
+from io_scene_bwx.types import MeshData, MatrixFrame, SubMaterialData
+
+# Tuple so the bypass check below is a single C-level str.startswith call
+BYPASS_OBJECT_NAMES = ('EV_', 'EP_', '@', 'SFX', 'billboard')
+
+# Compiled alternation of the same prefixes; matching stays O(name) as
+# the list grows instead of one startswith pass per prefix
+BYPASS_OBJECT_NAMES_RE = re.compile(
+    '|'.join(re.escape(name) for name in BYPASS_OBJECT_NAMES))
 
-BYPASS_OBJECT_NAMES = ['EV_', 'EP_', '@', 'SFX', 'billboard']
+# NumPy mirror of bwx_dx_vertex_struct, so a whole SLv2 vertex buffer is
+# decoded in one C call instead of per-vertex Construct dispatch
+DX_VERTEX_DTYPE = np.dtype([
+    ('positions', '<f4', 3),
+    ('normals', '<f4', 3),
+    ('tex_coords', '<f4', 2),
+])
+
+# Column permutation that flips triangle winding (a, b, c) -> (a, c, b)
+FLIP_PERM = np.array([0, 2, 1], dtype=np.intp)
+
+# Enum values compared against on every import / object, built once
+_SLV1 = EnumIntegerString('SLv1')
+_SLV2 = EnumIntegerString('SLv2')
+_MSHX = EnumIntegerString('MSHX')
 
 
 # Raise this error to have the importer report an error message.
@@ -26,11 +56,18 @@ class ImportError(RuntimeError):
 class BWXImporter:
     """BWX Importer class."""
 
+    # Batch imports create one importer per file; slots skip the
+    # per-instance dict
+    __slots__ = ('_materials', '_model', '_camera', '_bwx', '_sl_version',
+                 'filename', 'import_settings')
+
     def __init__(self, filename, import_settings):
         """initialization."""
-        self.materials = []
-        self.model = []
-        self.camera = []
+        self._materials = None
+        self._model = None
+        self._camera = None
+        self._bwx = None
+        self._sl_version = None
         self.filename = filename
         self.import_settings = import_settings
 
@@ -38,88 +75,190 @@ class BWXImporter:
         """Some checks."""
         pass
 
-    def read(self):
-        """Read file."""
+    def read(self, eager=True):
+        """Read file.
+
+        With eager=False the sections are only parsed when the model /
+        materials / camera properties are first accessed, so callers that
+        need a single section skip the rest.
+        """
         with open(self.filename, 'rb') as f:
-            content = memoryview(f.read())
-            # Parse PNX file
-            bwx = bwx_struct.parse(content)
+            if os.fstat(f.fileno()).st_size == 0:
+                # mmap rejects empty files; hand the parser an empty
+                # buffer so a zero-byte input fails the same way as any
+                # other truncated file
+                bwx = bwx_struct.parse(b'')
+            else:
+                # Map the file instead of reading it into a bytes object
+                # first; the kernel demand-pages it while the parser copies
+                # it into its stream, so the whole-file read stall and
+                # extra copy go away
+                with mmap.mmap(f.fileno(), 0,
+                               access=mmap.ACCESS_READ) as content:
+                    # Parse PNX file
+                    bwx = bwx_struct.parse(content)
             head = get_block(bwx, "HEAD")
 
-            if head.version == EnumIntegerString('SLv1'):
-                sl_version = 1
-            elif head.version == EnumIntegerString('SLv2'):
-                sl_version = 2
+            if head.version == _SLV1:
+                self._sl_version = 1
+            elif head.version == _SLV2:
+                self._sl_version = 2
             else:
                 raise ImportError("Unsupported version")
 
-            # Version 1
-            model = get_block(bwx, "OBJ2") if sl_version == 1 else get_block(bwx, "SPOB")
-
-            for o in model.object:
-                # Object
-                name = o.name.value
-                material = o.material.value
-
-                if any(name.startswith(n) for n in BYPASS_OBJECT_NAMES):
-                    # FIXME: Enable later when process with collision detection and etc.
-                    continue
-
-                meshes = []
-                for m in o.mesh:
-                    for sm in m.sub_mesh:
-                        if sl_version == 1:
-                            # Only retrieve the first face's sub material id as texture for whole mesh
-                            sub_material = m.sub_material[0].value
-                            positions = [Array(3, Float32l).parse(v.value)[:] for v in sm.vertex_buffer]
-                            normals = []
-                            tex_coords = [Array(2, Float32l).parse(u.value)[:] for u in sm.uv_buffer]
-                            indices = iter([i.value for i in m.index_buffer])
-                        else:
-                            # Version 2 use one int to represent the sub_material value
-                            sub_material = m.sub_material.value
-                            # There are two more vertices which are unknown
-                            # Remember to write two more back when exporting
-                            vertex_buffer = Array(sm.vertex_count.value, bwx_dx_vertex_struct).parse(
-                                sm.vertex_buffer.value)
-                            positions = [v.positions[:] for v in vertex_buffer]
-                            normals = [v.normals[:] for v in vertex_buffer]  # Unused right now
-                            tex_coords = [[v.tex_coords[0], 1 - v.tex_coords[1]] for v in vertex_buffer]
-                            indices = iter(Array(m.index_count.value, Int16ul).parse(m.index_buffer.value))
-
-                        # Flip if direction = "MSHX"
-                        flip = o.direction.value == EnumIntegerString('MSHX')
-                        faces = [(a, c, b) if flip else (a, b, c) for a, b, c in zip(indices, indices, indices)]
-                        timeline = sm.timeline.value
-
-                        meshes.append([timeline, sub_material, positions, normals, tex_coords, faces])
-
-                # Assume have only ONE matrix group - o.matrix[0]
-                matrices = [[m.timeline, m.matrix[:]] for m in o.matrix[0].matrices]
-
-                # Insert object into model
-                self.model.append([name, material, meshes, matrices])
-
-            # Process Materials
-            texture_path = pathlib.Path(self.filename).parent
-            mtrl = get_block(bwx, "MTRL")
-            for m in mtrl.material:
-                name = m.material_name.value
-                sub_materials = []
-                for sm in m.sub_material:
-                    sub_materials.append([
-                        sm.diffuse.value,
-                        sm.ambient.value,
-                        sm.specular.value,
-                        sm.highlight.value,
-                        str(texture_path.joinpath(
-                            pathlib.PureWindowsPath(sm.texture.filename.value).name).resolve()) if sm.texture else None
-                    ])
-                self.materials.append([name, sub_materials])
-
-            # Process Camera
-            cam = get_block(bwx, "CAM")
-            for c in cam.camera:
-                name = c.name.value
-                matrix = [[m.timeline, m.camera[:]] for m in c.matrix]
-                self.camera.append([name, matrix])
+            self._bwx = bwx
+
+            if eager:
+                _ = self.model, self.materials, self.camera
+
+    @property
+    def model(self):
+        """Model objects, parsed on first access."""
+        if self._model is None:
+            self._model = self._parse_objects(self._bwx, self._sl_version)
+        return self._model
+
+    @property
+    def materials(self):
+        """Materials, parsed on first access."""
+        if self._materials is None:
+            self._materials = self._parse_materials(self._bwx)
+        return self._materials
+
+    @property
+    def camera(self):
+        """Cameras, parsed on first access."""
+        if self._camera is None:
+            self._camera = self._parse_cameras(self._bwx)
+        return self._camera
+
+    def _parse_objects(self, bwx, sl_version):
+        """Parse model objects, meshes and matrix animations."""
+        # Version 1
+        model = get_block(bwx, "OBJ2") if sl_version == 1 else get_block(bwx, "SPOB")
+
+        # Resolve the mesh parser once, instead of branching on the version
+        # for every sub mesh
+        parse_mesh = self._parse_v1_mesh if sl_version == 1 else self._parse_v2_mesh
+
+        objects = []
+        for o in model.object:
+            # Object
+            name = o.name.value
+            material = o.material.value
+
+            if BYPASS_OBJECT_NAMES_RE.match(name):
+                # FIXME: Enable later when process with collision detection and etc.
+                continue
+
+            # Flip if direction = "MSHX"
+            flip = o.direction.value == _MSHX
+
+            meshes = []
+            for m in o.mesh:
+                for sm in m.sub_mesh:
+                    meshes.append(parse_mesh(m, sm, flip))
+
+            # Assume have only ONE matrix group - o.matrix[0]
+            matrix_timelines, matrix_frames = self._parse_matrices(o)
+
+            # Insert object into model
+            objects.append([name, material, meshes, (matrix_timelines, matrix_frames)])
+
+        return objects
+
+    def _parse_v1_mesh(self, m, sm, flip):
+        """Parse one SLv1 sub mesh into mesh data."""
+        # Only retrieve the first face's sub material id as texture for whole mesh
+        sub_material = m.sub_material[0].value
+        # Like the UVs below: each position is a 12-byte blob, so join once
+        # and decode with a single C call instead of Construct per vertex
+        positions = np.frombuffer(b''.join(v.value for v in sm.vertex_buffer),
+                                  dtype='<f4').reshape(-1, 3)
+        normals = np.empty((0, 3), np.float32)  # SLv1 stores no normals
+        # Each UV is an 8-byte blob; join once and decode in a single C call
+        tex_coords = np.frombuffer(b''.join(u.value for u in sm.uv_buffer),
+                                   dtype='<f4').reshape(-1, 2)
+        indices = np.fromiter((i.value for i in m.index_buffer), dtype=np.int32,
+                              count=len(m.index_buffer))
+        faces = indices.reshape(-1, 3)
+        if flip:
+            faces = faces[:, FLIP_PERM]
+        return MeshData(sm.timeline.value, sub_material, positions, normals, tex_coords, faces)
+
+    def _parse_v2_mesh(self, m, sm, flip):
+        """Parse one SLv2 (DirectX) sub mesh into mesh data."""
+        # Version 2 use one int to represent the sub_material value
+        sub_material = m.sub_material.value
+        # There are two more vertices which are unknown
+        # Remember to write two more back when exporting
+        vertex_buffer = np.frombuffer(sm.vertex_buffer.value, dtype=DX_VERTEX_DTYPE,
+                                      count=sm.vertex_count.value)
+        positions = vertex_buffer['positions']
+        normals = vertex_buffer['normals']  # Unused right now
+        tex_coords = vertex_buffer['tex_coords'].copy()
+        tex_coords[:, 1] = 1.0 - tex_coords[:, 1]
+        indices = np.frombuffer(m.index_buffer.value, dtype='<u2',
+                                count=m.index_count.value).astype(np.int32)
+        faces = indices.reshape(-1, 3)
+        if flip:
+            faces = faces[:, FLIP_PERM]
+        return MeshData(sm.timeline.value, sub_material, positions, normals, tex_coords, faces)
+
+    def _parse_matrices(self, o):
+        """Parse the matrix animation frames of one object.
+
+        Returns a (timelines, matrices) pair of NumPy arrays, shaped (N,)
+        int32 and (N, 4, 4) float32, instead of N MatrixFrame objects with
+        16 boxed floats each.
+        """
+        frames = o.matrix[0].matrices
+        n = len(frames)
+        timelines = np.fromiter((m.timeline for m in frames), dtype='<i4', count=n)
+        matrices = np.fromiter(chain.from_iterable(m.matrix for m in frames),
+                               dtype='<f4', count=n * 16).reshape(n, 4, 4)
+        return timelines, matrices
+
+    def _parse_materials(self, bwx):
+        """Parse materials and sub materials."""
+        # Plain string operations, Path.resolve() would stat every path
+        # component per texture
+        texture_path = os.path.abspath(os.path.dirname(self.filename))
+        mtrl = get_block(bwx, "MTRL")
+        materials = []
+        # The same diffuse/texture combination repeats across materials;
+        # keep one record per distinct sub material
+        cache = {}
+        for m in mtrl.material:
+            name = m.material_name.value
+            sub_materials = []
+            for sm in m.sub_material:
+                record = SubMaterialData(
+                    sm.diffuse.value,
+                    sm.ambient.value,
+                    sm.specular.value,
+                    sm.highlight.value,
+                    # Texture paths are stored Windows style, keep only the basename
+                    os.path.normpath(os.path.join(
+                        texture_path, ntpath.basename(sm.texture.filename.value))) if sm.texture else None,
+                )
+                sub_materials.append(cache.setdefault(record, record))
+            materials.append([name, sub_materials])
+
+        return materials
+
+    def _parse_cameras(self, bwx):
+        """Parse cameras and camera animations."""
+        cam = get_block(bwx, "CAM")
+        if cam is None:
+            # Most model files carry no camera block at all
+            return []
+        cameras = []
+        for c in cam.camera:
+            name = c.name.value
+            matrix = [MatrixFrame(m.timeline,
+                                  np.fromiter(m.camera, dtype=np.float32, count=16))
+                      for m in c.matrix]
+            cameras.append([name, matrix])
+
+        return cameras
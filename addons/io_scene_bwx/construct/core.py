@@ -1507,6 +1507,25 @@ class VarInt(Construct):
     """
 
     def _parse(self, stream, context, path):
+        # Fast path for BytesIO streams: scan the continuation bits on the
+        # underlying buffer and fold the groups in one pass, instead of a
+        # stream_read call and list append per byte
+        getbuffer = getattr(stream, "getbuffer", None)
+        if getbuffer is not None:
+            with getbuffer() as buf:
+                pos = stream.tell()
+                end = pos
+                limit = len(buf)
+                while end < limit and buf[end] & 0b10000000:
+                    end += 1
+                if end < limit:
+                    num = 0
+                    for i in range(end, pos - 1, -1):
+                        num = (num << 7) | (buf[i] & 0b01111111)
+                    stream.seek(end + 1)
+                    return num
+            raise StreamError("stream ended before varint terminated", path=path)
+
         acc = []
         while True:
             b = byte2int(stream_read(stream, 1, path))
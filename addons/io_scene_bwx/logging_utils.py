@@ -0,0 +1,28 @@
+# Copyright 2022 Tommy Lau @ SLODT
+#
+# Licensed under the GPL License, Version 3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.gnu.org/licenses/gpl-3.0.html
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+ADDON_NAME = 'io_scene_bwx'
+
+# logging.getLogger already caches by name; keep only the add-on's own
+# logger bound at module scope for the common no-argument call
+_DEFAULT_LOGGER = logging.getLogger(ADDON_NAME)
+
+
+def get_logger(name=ADDON_NAME):
+    """Return the add-on logger."""
+    if name is ADDON_NAME:
+        return _DEFAULT_LOGGER
+    return logging.getLogger(name)
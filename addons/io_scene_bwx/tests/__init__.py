@@ -0,0 +1,33 @@
+# Copyright 2022 Tommy Lau @ SLODT
+#
+# Licensed under the GPL License, Version 3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.gnu.org/licenses/gpl-3.0.html
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from pathlib import Path
+
+
+def run_tests():
+    """Discover and run the add-on test suite.
+
+    Runs under pytest when available (the TestCase classes run natively
+    there), falling back to plain unittest discovery. Test machinery is
+    imported here so walking the add-on tree (which Blender does at
+    startup) does not pull in the bpy mock and the whole importer stack.
+    """
+    tests_dir = str(Path(__file__).parent)
+    try:
+        import pytest
+    except ImportError:
+        import unittest
+        suite = unittest.TestLoader().discover(tests_dir)
+        return unittest.TextTestRunner().run(suite)
+    return pytest.main(['-q', tests_dir])
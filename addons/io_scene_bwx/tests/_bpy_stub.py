@@ -0,0 +1,44 @@
+# Copyright 2022 Tommy Lau @ SLODT
+#
+# Licensed under the GPL License, Version 3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.gnu.org/licenses/gpl-3.0.html
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A minimal bpy stand-in for running the tests outside Blender.
+
+Unlike MagicMock, attribute access here does not allocate a fresh mock
+per lookup; only the handful of attributes the add-on modules touch are
+defined, and anything beyond them fails loudly instead of silently
+returning another mock.
+"""
+
+import sys
+import types
+
+
+class _Namespace:
+    """Plain attribute bag."""
+
+
+def install():
+    """Put the stub into sys.modules unless a bpy is already present."""
+    if 'bpy' in sys.modules:
+        return sys.modules['bpy']
+    bpy = types.ModuleType('bpy')
+    bpy.app = _Namespace()
+    bpy.app.debug_value = 0
+    bpy.context = _Namespace()
+    bpy.data = _Namespace()
+    bpy.ops = _Namespace()
+    bpy.types = _Namespace()
+    bpy.utils = _Namespace()
+    sys.modules['bpy'] = bpy
+    return bpy
@@ -0,0 +1,147 @@
+# Copyright 2022 Tommy Lau @ SLODT
+#
+# Licensed under the GPL License, Version 3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.gnu.org/licenses/gpl-3.0.html
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+
+# Blender's Python API is only available inside Blender
+try:
+    from ._bpy_stub import install as _install_bpy_stub
+except ImportError:
+    from _bpy_stub import install as _install_bpy_stub
+_install_bpy_stub()
+
+# Load the add-on modules without executing the package __init__, which
+# would try to register the Blender operators against the mocked bpy
+if 'io_scene_bwx' not in sys.modules:
+    _pkg = types.ModuleType('io_scene_bwx')
+    _pkg.__path__ = [str(Path(__file__).resolve().parent.parent)]
+    sys.modules['io_scene_bwx'] = _pkg
+
+import numpy as np
+
+from io_scene_bwx.bwx_construct import ConstructError
+from io_scene_bwx.bwx_export import BWXWriter
+from io_scene_bwx.bwx_io import (BWXImporter, BYPASS_OBJECT_NAMES,
+                                 BYPASS_OBJECT_NAMES_RE)
+from io_scene_bwx.types import (BWXData, MaterialData, MeshData, ObjectData,
+                                SubMaterialData)
+
+
+def _sample_data():
+    """A small SLv2 scene with one textured, matrix-animated object."""
+    mesh = MeshData(
+        timeline=0,
+        sub_material=0,
+        positions=np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]], np.float32),
+        tex_coords=np.array([[0, 0], [1, 0], [0, 1]], np.float32),
+        faces=np.array([[0, 1, 2]], np.int32),
+    )
+    obj = ObjectData('Body', 0, [mesh],
+                     np.array([0], '<i4'),
+                     np.eye(4, dtype='<f4').reshape(1, 4, 4))
+    material = MaterialData('MAT_Body', [
+        SubMaterialData(0xFFFF0000, 0xFF00FF00, 0xFF0000FF, 0.5, 'body.png'),
+    ])
+    return BWXData(name='SAMPLE', version=2, materials=[material], objects=[obj])
+
+
+class TestBWXImporter(unittest.TestCase):
+    """Round-trip a written sample file through the importer."""
+
+    @classmethod
+    def setUpClass(cls):
+        # Write and parse the sample once; the tests only inspect it
+        cls.tempdir = tempfile.TemporaryDirectory()
+        cls.filename = str(Path(cls.tempdir.name) / 'SAMPLE_default.PNX')
+        BWXWriter(_sample_data()).write(cls.filename)
+        cls.importer = BWXImporter(cls.filename, {})
+        cls.importer.read()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tempdir.cleanup()
+
+    def test_model(self):
+        [name, material, meshes, _matrices] = self.importer.model[0]
+        self.assertEqual(name, 'Body')
+        self.assertEqual(material, 0)
+        np.testing.assert_array_equal(meshes[0].faces, [[0, 1, 2]])
+        np.testing.assert_allclose(meshes[0].positions,
+                                   [[0, 0, 0], [1, 0, 0], [0, 1, 0]])
+
+    def test_matrices(self):
+        [_name, _material, _meshes, (timelines, frames)] = self.importer.model[0]
+        np.testing.assert_array_equal(timelines, [0])
+        np.testing.assert_allclose(frames[0], np.eye(4))
+
+    def test_materials(self):
+        [name, sub_materials] = self.importer.materials[0]
+        self.assertEqual(name, 'MAT_Body')
+        self.assertEqual(sub_materials[0].diffuse & 0xFFFFFFFF, 0xFFFF0000)
+        self.assertEqual(Path(sub_materials[0].texture_path).name, 'body.png')
+
+    def test_file_not_found(self):
+        importer = BWXImporter(str(Path(self.tempdir.name) / 'missing.PNX'), {})
+        with self.assertRaises(FileNotFoundError):
+            importer.read()
+
+    def test_empty_file(self):
+        filename = str(Path(self.tempdir.name) / 'empty.PNX')
+        Path(filename).touch()
+        with self.assertRaises(ConstructError):
+            BWXImporter(filename, {}).read()
+
+    def test_invalid_file(self):
+        filename = str(Path(self.tempdir.name) / 'invalid.PNX')
+        Path(filename).write_bytes(b'not a bwx file at all')
+        with self.assertRaises(ConstructError):
+            BWXImporter(filename, {}).read()
+
+
+class TestMeshDataFromBuffer(unittest.TestCase):
+    """MeshData.from_buffer wraps a buffer without copying."""
+
+    def test_views_share_the_buffer(self):
+        positions = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]], '<f4')
+        faces = np.array([[0, 1, 2]], '<i4')
+        buf = positions.tobytes() + faces.tobytes()
+        mesh = MeshData.from_buffer(
+            0, 0, buf, {'positions': 0, 'faces': positions.nbytes},
+            vertex_count=3, face_count=1)
+        np.testing.assert_array_equal(mesh.positions, positions)
+        np.testing.assert_array_equal(mesh.faces, faces)
+        self.assertEqual(mesh.tex_coords.shape, (0, 2))
+        self.assertFalse(mesh.positions.flags.owndata)
+        self.assertFalse(mesh.faces.flags.owndata)
+
+
+class TestBypassPrefixes(unittest.TestCase):
+    """The object-name bypass tuple and its compiled pattern agree."""
+
+    def test_prefixes(self):
+        self.assertIn('EV_', BYPASS_OBJECT_NAMES)
+        self.assertIn('@', BYPASS_OBJECT_NAMES)
+
+    def test_pattern_matches_prefixed_names(self):
+        for prefix in BYPASS_OBJECT_NAMES:
+            self.assertIsNotNone(BYPASS_OBJECT_NAMES_RE.match(prefix + 'thing'))
+        self.assertIsNone(BYPASS_OBJECT_NAMES_RE.match('Body'))
+
+
+if __name__ == '__main__':
+    unittest.main()
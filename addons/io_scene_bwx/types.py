@@ -0,0 +1,151 @@
+# Copyright 2022 Tommy Lau @ SLODT
+#
+# Licensed under the GPL License, Version 3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.gnu.org/licenses/gpl-3.0.html
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+# All the records here use slots: the small ones are created once per sub
+# mesh / frame / sub material, and even the aggregates are created per file
+# in batch imports, so none of them need a per-instance __dict__.
+
+@dataclass(eq=False, slots=True)
+class MeshData:
+    """One sub mesh (one animation frame of an object).
+
+    The geometry lives in NumPy arrays: positions and normals are (N, 3)
+    float32, tex_coords is (N, 2) float32 and faces is (M, 3) int32, so
+    the parser fills them straight from the file buffers and Blender's
+    foreach_set consumes them without a Python-level flatten.
+    """
+    timeline: int
+    sub_material: int
+    positions: np.ndarray = field(default_factory=lambda: np.empty((0, 3), np.float32))
+    normals: np.ndarray = field(default_factory=lambda: np.empty((0, 3), np.float32))
+    tex_coords: np.ndarray = field(default_factory=lambda: np.empty((0, 2), np.float32))
+    faces: np.ndarray = field(default_factory=lambda: np.empty((0, 3), np.int32))
+
+    @property
+    def faces_flat(self):
+        """Flat (M*3,) int32 view of faces, the layout foreach_set wants."""
+        return self.faces.reshape(-1)
+
+    @classmethod
+    def from_buffer(cls, timeline, sub_material, buf, offsets,
+                    vertex_count, face_count):
+        """Wrap slices of an already-read buffer, without copying.
+
+        offsets maps 'positions' / 'normals' / 'tex_coords' / 'faces' to
+        byte offsets inside buf, which must hold the fields in the
+        in-memory layout (little-endian float32 / int32); omitted keys
+        keep their empty defaults. The arrays are views over buf, so the
+        caller must keep it alive for the life of the mesh.
+        """
+        specs = (('positions', '<f4', vertex_count, 3),
+                 ('normals', '<f4', vertex_count, 3),
+                 ('tex_coords', '<f4', vertex_count, 2),
+                 ('faces', '<i4', face_count, 3))
+        kwargs = {}
+        for name, dtype, count, width in specs:
+            if name in offsets:
+                kwargs[name] = np.frombuffer(
+                    buf, dtype=dtype, count=count * width,
+                    offset=offsets[name]).reshape(-1, width)
+        return cls(timeline, sub_material, **kwargs)
+
+
+@dataclass(eq=False, slots=True)
+class MatrixFrame:
+    """One matrix animation keyframe, matrix as 16 column-major float32."""
+    timeline: int
+    matrix: np.ndarray = field(default_factory=lambda: np.empty(16, np.float32))
+
+
+@dataclass(frozen=True, slots=True)
+class SubMaterialData:
+    """One sub material with its colors and optional texture.
+
+    Frozen so identical sub materials hash alike and the parser can
+    dedupe the many repeats across materials.
+    """
+    diffuse: int
+    ambient: int
+    specular: int
+    highlight: float
+    texture_path: str = None
+
+
+@dataclass(slots=True)
+class MaterialData:
+    """One material with its sub materials."""
+    name: str
+    sub_materials: list = field(default_factory=list)
+
+
+@dataclass(eq=False, slots=True)
+class ObjectData:
+    """One model object with its meshes and matrix animation.
+
+    The matrix animation is stored as two parallel arrays: timelines is
+    (F,) int32 and frames is (F, 4, 4) float32, instead of F MatrixFrame
+    records.
+
+    An object is either vertex animated (meshes) or matrix animated
+    (matrix_timelines/matrix_frames), never both, so the unused side
+    defaults to a shared empty sentinel instead of a fresh list.
+    """
+    name: str
+    material: int
+    meshes: list = ()
+    matrix_timelines: list = None
+    matrix_frames: list = None
+    direction: str = 'MSHX'
+
+    @property
+    def matrices(self):
+        """Deprecated: per-frame MatrixFrame views over the two arrays."""
+        if self.matrix_timelines is None or self.matrix_frames is None:
+            return []
+        return [MatrixFrame(int(timeline), np.ravel(frame))
+                for timeline, frame in zip(self.matrix_timelines,
+                                           self.matrix_frames)]
+
+
+@dataclass(slots=True)
+class CameraData:
+    """One camera with its animation keyframes."""
+    name: str
+    matrices: list = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class BWXData:
+    """A whole BWX scene, the unit the writer consumes."""
+    name: str = ''
+    version: int = 2
+    materials: list = field(default_factory=list)
+    objects: list = field(default_factory=list)
+    cameras: list = field(default_factory=list)
+
+    def reserve(self, n_materials=0, n_objects=0, n_cameras=0):
+        """Size the lists up front when the counts are known.
+
+        Builders that know the section counts can fill by index
+        (``data.objects[i] = obj``) instead of growing the lists append
+        by append through CPython's realloc chain.
+        """
+        self.materials = [None] * n_materials
+        self.objects = [None] * n_objects
+        self.cameras = [None] * n_cameras